@@ -1,25 +1,60 @@
 import csv
 import json
 import os
-import re
-
-def clean_filename(name):
-    """Clean a name to make it suitable for a filename."""
-    return re.sub(r'[^\w\s]', '', name).replace(' ', '_').lower()
-
-def zero_pad_number(num, length=6):
-    """Zero pad a number to the specified length."""
-    return str(num).zfill(length)
+from operator import itemgetter
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Roster columns copied into each person file, in the order process_csv unpacks them
+PERSON_COLUMNS = (
+    'Party',
+    'Person Wiki URL',
+    'Vote on Laken Riley',
+    'Vote on Laken Riley Notes',
+    'Vote on Laken Riley Points',
+    'Vote on H.R.1968',
+    'Vote on 1968 Points',
+    'Sum'
+)
+
+# Encoder used when orjson is not installed, created once rather than per file
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+def dump_json(data):
+    """Serialize data to compact JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data)
+    return _JSON_ENCODER.encode(data).encode('utf-8')
 
 def process_csv(csv_file, output_dir='output'):
     """Process the CSV file and generate JSON files."""
     # Create output directory if it doesn't exist
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
 
     # Read the CSV file
-    with open(csv_file, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
+    with open(csv_file, 'r', encoding='utf-8', newline='', buffering=1 << 20) as file:
+        reader = csv.reader(file)
+
+        # Resolve column positions once from the header row.
+        # Optional columns that are missing point one past the header, at the blank cell added to every row.
+        header = next(reader, [])
+        if not header:
+            # Empty file: nothing to migrate
+            return
+        width = len(header)
+        columns = {column: index for index, column in enumerate(header)}
+        district_index = columns['District']
+        name_index = columns['Name']
+        district_wiki_url_index = columns.get('District Wiki URL', width)
+        # Fetches all person cells of a row in one call
+        person_cells = itemgetter(*(columns.get(column, width) for column in PERSON_COLUMNS))
+
+        # Short rows get None for their missing cells (as csv.DictReader did); extra cells are dropped
+        padding = [None] * width + ['']
 
         # Track created person files to avoid duplicates
         person_files = {}
@@ -27,59 +62,61 @@ def process_csv(csv_file, output_dir='output'):
         person_counter = 1
 
         for row in reader:
-            district = row['District']
-            name = row['Name']
+            del row[width:]
+            row.extend(padding[len(row):])
+
+            district = row[district_index]
+            name = row[name_index]
 
             # Skip if row is empty or headers
             if not district or not name or district == 'District' or name == 'Name':
                 continue
 
+            # Congressional representative position file for this row, also linked from the person JSON
+            position_filename = "congressional_representative_position_%04d.json" % position_counter
+
             # Create person JSON file if not already created
             if name not in person_files:
-                person_filename = f"person_{zero_pad_number(person_counter)}.json"
+                person_filename = "person_%06d.json" % person_counter
                 person_files[name] = person_filename
 
-                # Get position filename for this district
-                position_filename = f"congressional_representative_position_{zero_pad_number(position_counter, 4)}.json"
+                (party, person_wiki_url, laken_riley_vote, laken_riley_notes, laken_riley_points,
+                 hr_1968_vote, hr_1968_points, total_points) = person_cells(row)
 
                 # Create the person data structure
                 person_data = {
                     "name": name,
                     "district": position_filename,  # Link to the position JSON file
-                    "party": row.get('Party', ''),
-                    "person_wiki_url": row.get('Person Wiki URL', ''),
+                    "party": party,
+                    "person_wiki_url": person_wiki_url,
                     "votes": {
                         "laken_riley": {
-                            "vote": row.get('Vote on Laken Riley', ''),
-                            "notes": row.get('Vote on Laken Riley Notes', ''),
-                            "points": row.get('Vote on Laken Riley Points', '')
+                            "vote": laken_riley_vote,
+                            "notes": laken_riley_notes,
+                            "points": laken_riley_points
                         },
                         "hr_1968": {
-                            "vote": row.get('Vote on H.R.1968', ''),
-                            "points": row.get('Vote on 1968 Points', '')
+                            "vote": hr_1968_vote,
+                            "points": hr_1968_points
                         }
                     },
-                    "total_points": row.get('Sum', '')
+                    "total_points": total_points
                 }
 
                 # Write person file
-                with open(os.path.join(output_dir, person_filename), 'w', encoding='utf-8') as person_file:
-                    json.dump(person_data, person_file, indent=2)
+                Path(output_dir, person_filename).write_bytes(dump_json(person_data))
 
                 person_counter += 1
 
-            # Create congressional representative position JSON file - defined earlier for reference in person JSON
-
             # Create the position data structure
             position_data = {
                 "district": district,
-                "district_wiki_url": row.get('District Wiki URL', ''),
+                "district_wiki_url": row[district_wiki_url_index],
                 "seat_holder": person_files.get(name, "vacant") if name else "vacant"
             }
 
             # Write position file
-            with open(os.path.join(output_dir, position_filename), 'w', encoding='utf-8') as position_file:
-                json.dump(position_data, position_file, indent=2)
+            Path(output_dir, position_filename).write_bytes(dump_json(position_data))
 
             position_counter += 1
 
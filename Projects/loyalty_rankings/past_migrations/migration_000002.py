@@ -1,55 +1,67 @@
 import csv
 import json
 import os
-import re
-import glob
-
-def clean_filename(name):
-    """Clean a name to make it suitable for a filename."""
-    return re.sub(r'[^\w\s]', '', name).replace(' ', '_').lower()
-
-def zero_pad_number(num, length=6):
-    """Zero pad a number to the specified length."""
-    return str(num).zfill(length)
+from operator import itemgetter
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Roster columns copied into each person file, in the order process_csv unpacks them
+PERSON_COLUMNS = (
+    'Party',
+    'Person Wiki URL',
+    'Vote on Laken Riley',
+    'Vote on Laken Riley Notes',
+    'Vote on Laken Riley Points',
+    'Vote on H.R.1968',
+    'Vote on 1968 Points',
+    'Sum'
+)
+
+# Encoder used when orjson is not installed, created once rather than per file
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+def dump_json(data):
+    """Serialize data to compact JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data)
+    return _JSON_ENCODER.encode(data).encode('utf-8')
 
 def get_last_person_number(output_dir):
     """Find the highest person file number in the output directory."""
-    person_files = glob.glob(os.path.join(output_dir, "person_*.json"))
-    if not person_files:
-        return 0
-
-    # Extract numbers from filenames
-    numbers = []
-    for file in person_files:
-        # Extract the number part from filename (person_000001.json -> 000001)
-        match = re.search(r'person_(\d+)\.json', os.path.basename(file))
-        if match:
-            numbers.append(int(match.group(1)))
-
-    return max(numbers) if numbers else 0
+    highest_number = 0
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            # Extract the number part from filename (person_000001.json -> 000001)
+            if name.startswith('person_') and name.endswith('.json'):
+                number = name[7:-5]
+                if number.isdigit():
+                    highest_number = max(highest_number, int(number))
+
+    return highest_number
 
 def get_last_position_number(output_dir):
     """Find the highest position file number in the output directory."""
-    position_files = glob.glob(os.path.join(output_dir, "*_position_*.json"))
-    if not position_files:
-        return 0
-
-    # Extract numbers from filenames
-    numbers = []
-    for file in position_files:
-        # Extract the number part from filename (senator_position_0001.json)
-        match = re.search(r'position_(\d+)\.json', os.path.basename(file))
-        if match:
-            numbers.append(int(match.group(1)))
-
-    return max(numbers) if numbers else 0
+    highest_number = 0
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            # Extract the number part from filename (senator_position_0001.json -> 0001)
+            if '_position_' in name and name.endswith('.json'):
+                number = name[name.rindex('_') + 1:-5]
+                if number.isdigit():
+                    highest_number = max(highest_number, int(number))
+
+    return highest_number
 
 def process_csv(csv_file, output_dir='output'):
     """Process the CSV file and generate JSON files."""
     # Create output directory if it doesn't exist
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created output directory: {output_dir}")
+    os.makedirs(output_dir, exist_ok=True)
 
     # Get the last person and position numbers used
     last_person_number = get_last_person_number(output_dir)
@@ -58,71 +70,88 @@ def process_csv(csv_file, output_dir='output'):
     print(f"Continuing from person #{last_person_number} and position #{last_position_number}")
 
     # Read the CSV file
-    with open(csv_file, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
+    with open(csv_file, 'r', encoding='utf-8', newline='', buffering=1 << 20) as file:
+        reader = csv.reader(file)
+
+        # Resolve column positions once from the header row.
+        # Optional columns that are missing point one past the header, at the blank cell added to every row.
+        header = next(reader, [])
+        if not header:
+            # Empty file: nothing to migrate
+            return
+        width = len(header)
+        columns = {column: index for index, column in enumerate(header)}
+        district_index = columns['District']
+        name_index = columns['Name']
+        district_wiki_url_index = columns.get('District Wiki URL', width)
+        # Fetches all person cells of a row in one call
+        person_cells = itemgetter(*(columns.get(column, width) for column in PERSON_COLUMNS))
+
+        # Short rows get None for their missing cells (as csv.DictReader did); extra cells are dropped
+        padding = [None] * width + ['']
+
         # Track created person files to avoid duplicates
         person_files = {}
         position_counter = last_position_number + 1
         person_counter = last_person_number + 1
 
         for row in reader:
-            district = row['District']
-            name = row['Name']
+            del row[width:]
+            row.extend(padding[len(row):])
+
+            district = row[district_index]
+            name = row[name_index]
 
             # Skip if row is empty or headers
             if not district or not name or district == 'District' or name == 'Name':
                 continue
 
+            # Senator position file for this row, also linked from the person JSON
+            position_filename = "senator_position_%04d.json" % position_counter
+
             # Create person JSON file if not already created
             if name not in person_files:
-                person_filename = f"person_{zero_pad_number(person_counter)}.json"
+                person_filename = "person_%06d.json" % person_counter
                 person_files[name] = person_filename
 
-                # Get position filename for this district
-                position_filename = f"senator_position_{zero_pad_number(position_counter, 4)}.json"
+                (party, person_wiki_url, laken_riley_vote, laken_riley_notes, laken_riley_points,
+                 hr_1968_vote, hr_1968_points, total_points) = person_cells(row)
 
                 # Create the person data structure
                 person_data = {
                     "name": name,
                     "district": position_filename,  # Link to the position JSON file
-                    "party": row.get('Party', ''),
-                    "person_wiki_url": row.get('Person Wiki URL', ''),
+                    "party": party,
+                    "person_wiki_url": person_wiki_url,
                     "votes": {
                         "laken_riley": {
-                            "vote": row.get('Vote on Laken Riley', ''),
-                            "notes": row.get('Vote on Laken Riley Notes', ''),
-                            "points": row.get('Vote on Laken Riley Points', '')
+                            "vote": laken_riley_vote,
+                            "notes": laken_riley_notes,
+                            "points": laken_riley_points
                         },
                         "hr_1968": {
-                            "vote": row.get('Vote on H.R.1968', ''),
-                            "points": row.get('Vote on 1968 Points', '')
+                            "vote": hr_1968_vote,
+                            "points": hr_1968_points
                         }
                     },
-                    "total_points": row.get('Sum', '')
+                    "total_points": total_points
                 }
 
                 # Write person file
                 person_filepath = os.path.join(output_dir, person_filename)
-                with open(person_filepath, 'w', encoding='utf-8') as person_file:
-                    json.dump(person_data, person_file, indent=2)
-                print(f"Created person file: {person_filepath}")
+                Path(person_filepath).write_bytes(dump_json(person_data))
                 person_counter += 1
 
-            # Create senator position JSON file
-            position_filename = f"senator_position_{zero_pad_number(position_counter, 4)}.json"
-
             # Create the position data structure
             position_data = {
                 "district": district,
-                "district_wiki_url": row.get('District Wiki URL', ''),
+                "district_wiki_url": row[district_wiki_url_index],
                 "seat_holder": person_files.get(name, "vacant") if name else "vacant"
             }
 
             # Write position file
             position_filepath = os.path.join(output_dir, position_filename)
-            with open(position_filepath, 'w', encoding='utf-8') as position_file:
-                json.dump(position_data, position_file, indent=2)
-            print(f"Created position file: {position_filepath}")
+            Path(position_filepath).write_bytes(dump_json(position_data))
             position_counter += 1
 
         print(f"Process complete. Created {person_counter - last_person_number - 1} new person files and {position_counter - last_position_number - 1} new position files.")
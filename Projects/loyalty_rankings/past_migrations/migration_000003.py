@@ -1,11 +1,53 @@
 import os
 import json
-import glob
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import time
 import logging
+import threading
+from urllib.parse import urlparse, unquote
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Prefer the C-backed lxml parser; html.parser still works if lxml isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Only the elements get_headshot_url looks at are built into the soup.
+# Classes are matched by regex so elements carrying several classes still match.
+_IMAGE_LINK_STRAINER = SoupStrainer('a', class_=re.compile(r'(^|\s)mw-file-description(\s|$)'))
+_FULL_IMAGE_STRAINER = SoupStrainer(class_=re.compile(r'(^|\s)fullImageLink(\s|$)'))
+
+# Matches the image file name at the end of a Wikipedia thumbnail src
+_JPG_RE = re.compile(r'(/[^/]+\.jpg)')
+
+# Wikipedia pages are fetched by a small thread pool; the rate limit is shared by all workers
+MAX_WORKERS = 8
+REQUEST_INTERVAL = 0.25  # minimum seconds between the starts of two requests to Wikimedia
+_rate_lock = threading.Lock()
+_next_request_time = 0.0
+
+# One session for every request so Wikipedia/Commons connections are kept alive and reused
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
 
 # Set up logging
 logging.basicConfig(
@@ -17,9 +59,72 @@ logging.basicConfig(
     ]
 )
 
+# Encoder used when orjson is not installed, created once rather than per file
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+def load_json(data):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dump_json(data):
+    """Serialize data to compact JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data)
+    return _JSON_ENCODER.encode(data).encode('utf-8')
+
+def wait_for_request_slot():
+    """Block until the calling thread may start its next Wikipedia request."""
+    global _next_request_time
+    with _rate_lock:
+        now = time.monotonic()
+        start = max(now, _next_request_time)
+        _next_request_time = start + REQUEST_INTERVAL
+    time.sleep(start - now)
+
+def _get(url, **kwargs):
+    """Send a GET through the shared session once the rate limiter allows it."""
+    wait_for_request_slot()
+    return SESSION.get(url, **kwargs)
+
+def get_headshot_url_from_api(wiki_url):
+    """
+    Ask the MediaWiki API for the original lead image of a Wikipedia article.
+
+    Args:
+        wiki_url (str): The full Wikipedia article URL
+
+    Returns:
+        str or None: The original image URL, or None if the API has no image for the page
+    """
+    parsed_url = urlparse(wiki_url)
+    if not parsed_url.netloc.endswith('wikipedia.org') or not parsed_url.path.startswith('/wiki/'):
+        return None
+
+    response = _get(f"https://{parsed_url.netloc}/w/api.php", params={
+        'action': 'query',
+        'titles': unquote(parsed_url.path[len('/wiki/'):]),
+        'prop': 'pageimages',
+        'piprop': 'original',
+        'redirects': 1,
+        'format': 'json',
+        'formatversion': 2
+    })
+    response.raise_for_status()
+
+    for page in response.json().get('query', {}).get('pages', []):
+        source = page.get('original', {}).get('source')
+        if source:
+            return source
+    return None
+
 def get_headshot_url(wiki_url):
     """
-    Crawl the Wikipedia page and extract the headshot image URL.
+    Find the headshot image URL for a Wikipedia page.
+
+    The page image API is tried first; the page HTML is only fetched and scraped
+    when the API has no image for it or the API request fails.
 
     Args:
         wiki_url (str): The Wikipedia URL to crawl
@@ -30,22 +135,26 @@ def get_headshot_url(wiki_url):
     if not wiki_url:
         return None
 
-    # Add a delay to avoid hitting rate limits
-    time.sleep(1)
-
     try:
         # Make sure the URL is properly formatted
         if not wiki_url.startswith('http'):
             wiki_url = f"https://en.wikipedia.org{wiki_url}"
 
+        # The API returns the original image directly, without downloading and parsing the page
+        try:
+            headshot_url = get_headshot_url_from_api(wiki_url)
+        except Exception as e:
+            logging.warning(f"Page image API failed for {wiki_url}, scraping instead: {str(e)}")
+            headshot_url = None
+        if headshot_url:
+            return headshot_url
+
         # Fetch the page
-        response = requests.get(wiki_url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        response = _get(wiki_url)
         response.raise_for_status()
 
         # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, HTML_PARSER, parse_only=_IMAGE_LINK_STRAINER)
 
         # Look for the image link with class mw-file-description
         image_link = soup.select_one('a.mw-file-description')
@@ -77,7 +186,7 @@ def get_headshot_url(wiki_url):
         data_file_height = img.get('data-file-height')
 
         # Extract the base filename from the src
-        match = re.search(r'(/[^/]+\.jpg)', src)
+        match = _JPG_RE.search(src)
         if not match:
             # Try to construct from the href instead
             file_name = os.path.basename(href)
@@ -95,11 +204,9 @@ def get_headshot_url(wiki_url):
             # Try to construct the full URL
             commons_url = f"https://commons.wikimedia.org/wiki/File:{file_name}"
             try:
-                commons_response = requests.get(commons_url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                })
+                commons_response = _get(commons_url)
                 commons_response.raise_for_status()
-                commons_soup = BeautifulSoup(commons_response.text, 'html.parser')
+                commons_soup = BeautifulSoup(commons_response.content, HTML_PARSER, parse_only=_FULL_IMAGE_STRAINER)
                 full_img_link = commons_soup.select_one('.fullImageLink a')
                 if full_img_link and full_img_link.get('href'):
                     full_url = full_img_link.get('href')
@@ -116,10 +223,11 @@ def get_headshot_url(wiki_url):
         # Extract the base path from the src
         base_path = match.group(1)
 
-        # Identify the directory structure (typically first two chars of the file hash)
-        src_parts = src.split('/')
+        # Identify the directory structure (typically first two chars of the file hash);
+        # only the last four path segments matter, so split at most four times from the right
+        src_parts = src.rsplit('/', 4)
         if len(src_parts) >= 4:
-            hash_dir = '/'.join(src_parts[-4:-2])  # Get the hash directory parts
+            hash_dir = f"{src_parts[-4]}/{src_parts[-3]}"  # Get the hash directory parts
 
             # Construct the full resolution URL
             full_url = f"https://upload.wikimedia.org/wikipedia/commons/{hash_dir}{base_path}"
@@ -135,60 +243,208 @@ def get_headshot_url(wiki_url):
         logging.error(f"Error processing {wiki_url}: {str(e)}")
         return None
 
-def process_person_files(output_dir='output'):
+def load_done_files(done_path):
     """
-    Process all person JSON files in the output directory.
+    Read the person files finished on previous runs.
 
     Args:
-        output_dir (str): The directory containing the person JSON files
+        done_path (str): Path to the done list, one "file_name mtime_ns" entry per line
+
+    Returns:
+        dict: File name to the modification time it had when it was recorded
     """
-    # Find all person files
-    person_files = glob.glob(os.path.join(output_dir, "person_*.json"))
-    logging.info(f"Found {len(person_files)} person files to process")
+    done_files = {}
+    try:
+        with open(done_path, 'r', encoding='utf-8') as done_file:
+            for line in done_file:
+                file_name, _, mtime_ns = line.strip().partition(' ')
+                if mtime_ns.isdigit():
+                    done_files[file_name] = int(mtime_ns)
+    except FileNotFoundError:
+        pass
+    return done_files
+
+def load_headshot_cache(cache_path):
+    """
+    Read the wiki URL to headshot URL cache kept between runs.
 
-    updated_count = 0
-    skipped_count = 0
-    error_count = 0
+    Args:
+        cache_path (str): Path to the cache JSON file
 
-    for file_path in person_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                person_data = json.load(file)
+    Returns:
+        dict: Wiki URL to resolved headshot URL, empty if there is no usable cache yet
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            return load_json(cache_file.read())
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logging.warning(f"Ignoring unreadable headshot cache {cache_path}: {str(e)}")
+        return {}
+
+def save_headshot_cache(cache_path, headshot_cache):
+    """
+    Write the headshot cache, replacing the previous file only once the new one is complete.
+
+    Args:
+        cache_path (str): Path to the cache JSON file
+        headshot_cache (dict): Wiki URL to resolved headshot URL
+    """
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'wb') as cache_file:
+        cache_file.write(dump_json(headshot_cache))
+    os.replace(temp_path, cache_path)
+
+class HeadshotLookups:
+    """
+    Resolve wiki URLs to headshot URLs for the worker threads.
+
+    Each URL is looked up at most once per run: the first worker to ask for it does the
+    lookup and any other worker asking for the same URL waits for that result.
+    """
+
+    def __init__(self, headshot_cache):
+        """
+        Args:
+            headshot_cache (dict): Wiki URL to headshot URL from earlier runs, updated on success
+        """
+        self.headshot_cache = headshot_cache
+        self._lookups = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, wiki_url):
+        """
+        Return the headshot URL for a wiki URL, reusing one already resolved.
+
+        Args:
+            wiki_url (str): The Wikipedia URL from the person file
+
+        Returns:
+            str or None: The full image URL if found, None otherwise
+        """
+        with self._lock:
+            lookup = self._lookups.get(wiki_url)
+            is_owner = lookup is None
+            if is_owner:
+                lookup = self._lookups[wiki_url] = Future()
+
+        if is_owner:
+            try:
+                headshot_url = self.headshot_cache.get(wiki_url) or get_headshot_url(wiki_url)
+                if headshot_url:
+                    self.headshot_cache[wiki_url] = headshot_url
+                lookup.set_result(headshot_url)
+            except BaseException as e:
+                lookup.set_exception(e)
+                raise
+
+        return lookup.result()
+
+def mark_done(done_file, file_path, file_name):
+    """Record a finished person file along with its current modification time."""
+    done_file.write(f"{file_name} {os.stat(file_path).st_mtime_ns}\n")
+
+def process_person_file(file_path, headshot_lookups):
+    """
+    Look up and store the headshot URL for a single person file.
+
+    Runs on a worker thread; the caller records finished files and tallies the results.
+
+    Args:
+        file_path (str): Path to the person JSON file
+        headshot_lookups (HeadshotLookups): Shared wiki URL to headshot URL resolver
+
+    Returns:
+        str: "updated", "has_headshot", "skipped" or "error"
+    """
+    try:
+        # Read and rewrite through one handle instead of opening the file twice
+        with open(file_path, 'rb+') as person_file:
+            person_data = load_json(person_file.read())
 
             # Skip if headshot_url already exists
             if "headshot_url" in person_data and person_data["headshot_url"]:
-                logging.info(f"Skipping {file_path} - headshot_url already exists")
-                skipped_count += 1
-                continue
+                return "has_headshot"
 
             # Get the person_wiki_url
             wiki_url = person_data.get("person_wiki_url")
             if not wiki_url:
                 logging.warning(f"No person_wiki_url found in {file_path}")
-                skipped_count += 1
-                continue
+                return "skipped"
 
-            # Get the headshot URL
-            logging.info(f"Processing {person_data.get('name', 'Unknown')} from {wiki_url}")
-            headshot_url = get_headshot_url(wiki_url)
+            # Get the headshot URL, reusing one resolved on an earlier run or for another file
+            headshot_url = headshot_lookups.resolve(wiki_url)
 
-            if headshot_url:
-                # Update the person data
-                person_data["headshot_url"] = headshot_url
+            if not headshot_url:
+                logging.warning(f"No headshot found for {person_data.get('name', 'Unknown')} at {wiki_url}")
+                return "error"
 
-                # Write the updated data back to the file
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    json.dump(person_data, file, indent=2)
+            # Update the person data
+            person_data["headshot_url"] = headshot_url
 
-                logging.info(f"Updated {file_path} with headshot_url: {headshot_url}")
-                updated_count += 1
-            else:
-                logging.warning(f"No headshot found for {person_data.get('name', 'Unknown')} at {wiki_url}")
-                error_count += 1
+            # Write the updated data back over the file contents
+            person_file.seek(0)
+            person_file.truncate()
+            person_file.write(dump_json(person_data))
 
-        except Exception as e:
-            logging.error(f"Error processing file {file_path}: {str(e)}")
-            error_count += 1
+        return "updated"
+
+    except Exception as e:
+        logging.error(f"Error processing file {file_path}: {str(e)}")
+        return "error"
+
+def process_person_files(output_dir='output', cache_path='.headshot_cache.json'):
+    """
+    Process all person JSON files in the output directory.
+
+    Args:
+        output_dir (str): The directory containing the person JSON files
+        cache_path (str): The wiki URL to headshot URL cache shared across runs
+    """
+    # Find all person files
+    with os.scandir(output_dir) as entries:
+        person_files = [
+            entry.path for entry in entries
+            if entry.name.startswith('person_') and entry.name.endswith('.json') and entry.is_file()
+        ]
+    logging.info(f"Found {len(person_files)} person files to process")
+
+    # Files that already have a headshot_url are recorded so reruns can skip them without parsing.
+    # A file rewritten since it was recorded (e.g. by rebuilding the output) no longer matches and is processed again.
+    done_path = os.path.join(output_dir, ".headshots_done.txt")
+    done_files = load_done_files(done_path)
+
+    pending_files = []
+    for file_path in person_files:
+        file_name = os.path.basename(file_path)
+        if file_name not in done_files or done_files[file_name] != os.stat(file_path).st_mtime_ns:
+            pending_files.append(file_path)
+
+    updated_count = 0
+    skipped_count = len(person_files) - len(pending_files)
+    error_count = 0
+
+    headshot_cache = load_headshot_cache(cache_path)
+    process_file = partial(process_person_file, headshot_lookups=HeadshotLookups(headshot_cache))
+
+    # Workers fetch and rewrite files; the done list and counters are only touched on this thread
+    try:
+        with open(done_path, 'a', encoding='utf-8') as done_file, \
+                ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for file_path, status in zip(pending_files, executor.map(process_file, pending_files)):
+                if status in ("updated", "has_headshot"):
+                    mark_done(done_file, file_path, os.path.basename(file_path))
+
+                if status == "updated":
+                    updated_count += 1
+                elif status == "error":
+                    error_count += 1
+                else:
+                    skipped_count += 1
+    finally:
+        # Save whatever was resolved, even if the run was interrupted
+        save_headshot_cache(cache_path, headshot_cache)
 
     logging.info(f"Migration complete. Updated: {updated_count}, Skipped: {skipped_count}, Errors: {error_count}")
 
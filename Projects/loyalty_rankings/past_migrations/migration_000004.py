@@ -1,7 +1,5 @@
 import os
-import glob
 import shutil
-import re
 
 def setup_log_directory():
     """
@@ -30,15 +28,15 @@ def setup_log_directory():
         print(f"Source log file not found: {source_log}")
         return
 
-    # Find the highest migration log number
-    log_files = glob.glob(os.path.join(log_dir, "migration_*.log"))
-
+    # Find the highest migration log number (migration_000001.log -> 1)
     highest_number = 0
-    for log_file in log_files:
-        match = re.search(r'migration_(\d+)\.log', os.path.basename(log_file))
-        if match:
-            number = int(match.group(1))
-            highest_number = max(highest_number, number)
+    with os.scandir(log_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('migration_') and name.endswith('.log'):
+                number = name[10:-4]
+                if number.isdigit():
+                    highest_number = max(highest_number, int(number))
 
     # Calculate the next log number
     next_number = highest_number + 1